@@ -1,20 +1,31 @@
 # coding=utf-8
 import hashlib
+import struct
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
 from event import Event
 from typing import Iterable, Self
 
+_BLOCK_STR_FORMAT = "(%s,%d);%d;%d;%d;[%s]"
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class BlockReference:
     """Reference to another block"""
     hashvalue: str  # hash of the block
     origin: int  # node generating this block.
 
     def to_str(self) -> str:
-        """generating a string to be digested in the hashing"""
+        """string representation of the reference, for debugging"""
         return f"({self.hashvalue},{self.origin})"
 
+    def _to_bytes(self) -> bytes:
+        """generating the bytes to be digested in the hashing"""
+        hash_bytes = bytes.fromhex(self.hashvalue)
+        return (struct.pack("<B", len(hash_bytes)) + hash_bytes
+                + struct.pack("<q", self.origin))
+
     def to_dict(self) -> dict:
         return {
             "hashvalue": self.hashvalue,
@@ -29,24 +40,63 @@ class BlockReference:
             )
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Block:
     parent_block: BlockReference
     origin: int
     index: int
     seed: int
-    hashvalue: str
+    hashvalue: str  # hex encoded sha256 digest (32 bytes)
     events: list[Event]
 
     def __hash__(self) -> int:
-        return int(self.hashvalue, 16)
+        # str caches its hash, so no parsing of the hex digest per lookup.
+        return hash(self.hashvalue)
 
     def to_str(self) -> str:
-        event_str = ",".join(e.to_str() for e in self.events)
-        return (f"{self.parent_block.to_str()};"
-                f"{self.origin};{self.index};"
-                f"{self.seed};"
-                f"[{event_str}]")
+        """string representation of the block, for debugging"""
+        return _BLOCK_STR_FORMAT % (
+            self.parent_block.hashvalue,
+            self.parent_block.origin,
+            self.origin,
+            self.index,
+            self.seed,
+            ",".join(map(Event.to_str, self.events)))
+
+    @staticmethod
+    def _prefix_midstate(
+            parent_block: BlockReference,
+            origin: int,
+            index: int,
+            events: list[Event]
+            ):
+        """
+        sha256 state after digesting everything that doesn't depend on
+        the seed.
+        """
+        # sha256 instead of sha512, since hashlib uses the
+        #  SHA extensions of the CPU for it (requires OpenSSL >= 1.1.1).
+        h = hashlib.sha256(parent_block._to_bytes())
+        h.update(struct.pack("<qq", origin, index))
+        h.update(Block.events_digest(events))
+        return h
+
+    @staticmethod
+    def events_digest(events: list[Event]) -> bytes:
+        """
+        sha256 digest over all events.
+
+        The block hash covers this fixed size digest instead of the events.
+        """
+        return hashlib.sha256(
+            b"".join(event._to_bytes() for event in events)).digest()
+
+    @staticmethod
+    def _hashvalue_with_seed(midstate, seed: int) -> str:
+        """finishes a copy of the midstate with the seed."""
+        h = midstate.copy()
+        h.update(struct.pack("<q", seed))
+        return h.hexdigest()
 
     @staticmethod
     def create_new(
@@ -56,14 +106,56 @@ class Block:
             seed: int,
             events: list[Event]
             ) -> Self:
-        h = hashlib.sha512(
-            Block(parent_block, origin, index, seed, "", events)
-            .to_str()
-            .encode()
-        )
-        hashvalue = h.hexdigest()
+        midstate = Block._prefix_midstate(
+            parent_block, origin, index, events)
+        hashvalue = Block._hashvalue_with_seed(midstate, seed)
         return Block(parent_block, origin, index, seed, hashvalue, events)
 
+    @staticmethod
+    def create_batch(
+            parent_block: BlockReference,
+            origin: int,
+            index: int,
+            seeds: Iterable[int],
+            events: list[Event]
+            ) -> list[Self]:
+        """
+        Create a block for each of the seeds.
+
+        The hashing of everything independent of the seed is only done
+        once, which makes this cheaper than calling create_new per seed.
+        """
+        midstate = Block._prefix_midstate(parent_block, origin, index, events)
+        return [
+            Block(parent_block, origin, index, seed,
+                  Block._hashvalue_with_seed(midstate, seed), events)
+            for seed in seeds]
+
+    @staticmethod
+    def mine(
+            parent_block: BlockReference,
+            origin: int,
+            index: int,
+            events: list[Event],
+            log_difficulty: int,
+            seeds: Iterable[int]
+            ) -> Self | None:
+        """
+        Search the seeds for a valid block,
+          i.e. a block whose hash ends in log_difficulty zero bits.
+
+        returns the block of the first valid seed,
+          or None if none of the seeds is valid.
+        """
+        midstate = Block._prefix_midstate(parent_block, origin, index, events)
+        difficulty_mask = 2**log_difficulty - 1
+        for seed in seeds:
+            hashvalue = Block._hashvalue_with_seed(midstate, seed)
+            if int(hashvalue, 16) & difficulty_mask == 0:
+                return Block(parent_block, origin, index, seed,
+                             hashvalue, events)
+        return None
+
     def to_dict(self) -> dict:
         return {
             "parent_block": self.parent_block.to_dict(),
@@ -97,10 +189,11 @@ class Blockchain:
         assert genesis_block.index == 0
         self._chain_blocks: dict[str, Block] = \
             {genesis_block.hashvalue: genesis_block}
-        self._genesis_hashvalue: str = genesis_block.hashvalue
-
-        self._head_hashvalue: str = genesis_block.hashvalue
-        self._orphan_blocks: set[Block] = set()
+        # hashvalues of the longest chain, indexed by block index.
+        #  the last one is the head block.
+        self._height_to_hash: list[str] = [genesis_block.hashvalue]
+        # orphan blocks indexed by the reference to their parent.
+        self._orphans_by_parent: dict[BlockReference, list[Block]] = {}
 
     @staticmethod
     def create_new() -> Self:
@@ -115,39 +208,81 @@ class Blockchain:
         returns CHILD_BLOCK if the parent block is already known.
         return ORPHAN_BLOCK if the parent block is unknown.
         """
-        if block.parent_block.hashvalue in self._chain_blocks:
-            assert block.parent_block.origin == \
-                self._chain_blocks[
-                    block.parent_block.hashvalue].origin
-            assert self._chain_blocks[
-                    block.parent_block.hashvalue].index + 1 == block.index
-            self._chain_blocks[block.hashvalue] = block
-            if block.index > self._chain_blocks[self._head_hashvalue].index:
-                self._head_hashvalue = block.hashvalue
-            block_reference = BlockReference(block.hashvalue, block.origin)
-            for orphan_block in self._orphan_blocks.copy():
-                if orphan_block.parent_block == block_reference:
-                    ret = self.add_block(orphan_block)
-                    assert ret == self.CHILD_BLOCK
-            return self.CHILD_BLOCK
-        else:
-            self._orphan_blocks.add(block)
+        if block.parent_block.hashvalue not in self._chain_blocks:
+            self._orphans_by_parent.setdefault(
+                block.parent_block, []).append(block)
             return self.ORPHAN_BLOCK
+        # adding a block may adopt orphans waiting for it as parent,
+        #  which may in turn adopt their own orphans.
+        pending = deque([block])
+        while pending:
+            block = pending.popleft()
+            parent_block = self._chain_blocks[block.parent_block.hashvalue]
+            assert block.parent_block.origin == parent_block.origin
+            assert parent_block.index + 1 == block.index
+            self._chain_blocks[block.hashvalue] = block
+            if block.index >= len(self._height_to_hash):
+                self._set_head_block(block)
+            pending.extend(self._orphans_by_parent.pop(
+                block.get_reference(), ()))
+        return self.CHILD_BLOCK
+
+    def _set_head_block(self, block: Block):
+        """
+        Make block the head of the longest chain.
+
+        Only the part of the chain diverging from the current longest chain
+        is walked.
+        """
+        diverging_hashvalues = []
+        while (block.index >= len(self._height_to_hash)
+               or self._height_to_hash[block.index] != block.hashvalue):
+            diverging_hashvalues.append(block.hashvalue)
+            block = self._chain_blocks[block.parent_block.hashvalue]
+        del self._height_to_hash[block.index + 1:]
+        self._height_to_hash.extend(reversed(diverging_hashvalues))
 
     def get_longest_chain(self) -> Iterable[Block]:
         """
         Return an iterable over the longest chain.
         """
-        longest_chain = []
-        next_hashvalue = self._head_hashvalue
-        while next_hashvalue != self._genesis_hashvalue:
-            block = self._chain_blocks[next_hashvalue]
-            longest_chain.append(block)
-            next_hashvalue = block.parent_block.hashvalue
-        return reversed(longest_chain)
+        return (self._chain_blocks[hashvalue]
+                for hashvalue in self._height_to_hash[1:])
 
     def get_head_block(self) -> Block:
         """
         return the head block of the longest chain.
         """
-        return self._chain_blocks[self._head_hashvalue]
+        return self._chain_blocks[self._height_to_hash[-1]]
+
+
+def mine_parallel(
+        parent_block: BlockReference,
+        origin: int,
+        index: int,
+        events: list[Event],
+        log_difficulty: int,
+        seeds: range,
+        num_workers: int | None = None,
+        chunk_size: int = 4096
+        ) -> Block | None:
+    """
+    Like Block.mine, but searches chunks of the seeds in worker processes.
+
+    returns the first valid block found by any worker,
+      which is not necessarily the one of the smallest valid seed.
+    """
+    executor = ProcessPoolExecutor(num_workers)
+    try:
+        futures = [
+            executor.submit(
+                Block.mine, parent_block, origin, index, events,
+                log_difficulty, seeds[start:start + chunk_size])
+            for start in range(0, len(seeds), chunk_size)]
+        for future in as_completed(futures):
+            block = future.result()
+            if block is not None:
+                return block
+        return None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -1,6 +1,7 @@
 import unittest as ut
 import random
-from blockchain import Block, Blockchain, BlockReference
+from blockchain import Block, Blockchain, BlockReference, mine_parallel
+from event import Event
 
 
 class TestBlock(ut.TestCase):
@@ -36,6 +37,42 @@ class TestBlock(ut.TestCase):
                 successes.append(r)
         self.assertGreater(len(successes), 0)
 
+    def test_create_batch(self):
+        """
+        create_batch creates the same blocks as create_new for each seed.
+        """
+        events = [Event("cc6df142", "d103ba6d", "create", "Entry")]
+        blocks = Block.create_batch(
+            BlockReference("", 0), 1, 1, range(10), events)
+        self.assertEqual(
+            blocks,
+            [Block.create_new(BlockReference("", 0), 1, 1, seed, events)
+             for seed in range(10)])
+
+    def test_mine(self):
+        """
+        mine returns the block of the first seed, whose hash ends in
+        log_difficulty zero bits.
+        """
+        block = Block.mine(BlockReference("", 0), 0, 0, [], 4, range(1000))
+        self.assertIsNotNone(block)
+        self.assertEqual(int(block.hashvalue, 16) % 16, 0)
+        self.assertEqual(
+            block,
+            Block.create_new(BlockReference("", 0), 0, 0, block.seed, []))
+        for seed in range(block.seed):
+            self.assertIsNone(
+                Block.mine(BlockReference("", 0), 0, 0, [], 4, [seed]))
+
+    def test_mine_parallel(self):
+        """
+        mine_parallel finds a valid block using worker processes.
+        """
+        block = mine_parallel(
+            BlockReference("", 0), 0, 0, [], 4, range(1000),
+            num_workers=2, chunk_size=100)
+        self.assertIsNotNone(block)
+        self.assertEqual(int(block.hashvalue, 16) % 16, 0)
 
 
 class TestBlockchain(ut.TestCase):
@@ -144,3 +181,44 @@ class TestBlockchain(ut.TestCase):
         self.assertEqual(chain.get_head_block(), block2)
         longest_chain = list(chain.get_longest_chain())
         self.assertEqual(longest_chain, [block1, block2])
+
+    def test_add_orphan_chain(self):
+        """
+        a chain of orphans is adopted once the missing block arrives,
+        regardless of the order the orphans were received in.
+        """
+        chain = Blockchain.create_new()
+        blocks = []
+        parent_reference = chain.get_head_block().get_reference()
+        for index in range(1, 5):
+            block = Block.create_new(parent_reference, 1, index, index, [])
+            blocks.append(block)
+            parent_reference = block.get_reference()
+        for block in reversed(blocks[1:]):
+            self.assertEqual(chain.add_block(block), Blockchain.ORPHAN_BLOCK)
+        self.assertEqual(list(chain.get_longest_chain()), [])
+        self.assertEqual(chain.add_block(blocks[0]), Blockchain.CHILD_BLOCK)
+        self.assertEqual(chain.get_head_block(), blocks[-1])
+        self.assertEqual(list(chain.get_longest_chain()), blocks)
+
+    def test_switch_longest_chain(self):
+        """
+        a side chain overtaking the longest chain becomes the longest chain.
+        """
+        chain = Blockchain.create_new()
+        genesis_reference = chain.get_head_block().get_reference()
+        block1 = Block.create_new(genesis_reference, 1, 1, 120, [])
+        block2 = Block.create_new(block1.get_reference(), 1, 2, 121, [])
+        chain.add_block(block1)
+        chain.add_block(block2)
+        side_block1 = Block.create_new(genesis_reference, 2, 1, 122, [])
+        side_block2 = Block.create_new(side_block1.get_reference(), 2, 2, 123, [])
+        side_block3 = Block.create_new(side_block2.get_reference(), 2, 3, 124, [])
+        chain.add_block(side_block1)
+        chain.add_block(side_block2)
+        self.assertEqual(list(chain.get_longest_chain()), [block1, block2])
+        chain.add_block(side_block3)
+        self.assertEqual(chain.get_head_block(), side_block3)
+        self.assertEqual(
+            list(chain.get_longest_chain()),
+            [side_block1, side_block2, side_block3])
@@ -7,25 +7,122 @@ where m is the bloom filter size and n is the number of nodes.
 """
 
 from typing import Self
+import array
+import functools
 import hashlib
+import sys
+
+# Each position of the filter is a counter stored in a lane of
+# _COUNTER_BITS bits of a single python int.
+# The highest bit of every lane is kept free as a guard bit,
+# which allows comparing and merging all lanes at once with plain
+# integer arithmetic (SWAR) instead of looping over the positions.
+_COUNTER_BITS = 16
+_COUNTER_MAX = (1 << (_COUNTER_BITS - 1)) - 1
+_LANE_MASK = (1 << _COUNTER_BITS) - 1
+
+
+@functools.lru_cache(maxsize=None)
+def _guard_bits(size: int) -> int:
+    """Returns an int with the guard bit of each of the size lanes set."""
+    guard = 1 << (_COUNTER_BITS - 1)
+    bits = 0
+    for position in range(size):
+        bits |= guard << (position * _COUNTER_BITS)
+    return bits
+
+
+def _is_subset(bits: int, other_bits: int, size: int) -> bool:
+    """True iff every counter of bits is at most the counter of other_bits."""
+    guards = _guard_bits(size)
+    # Subtracting lane-wise leaves the guard bit of a lane set
+    #  iff the lane of other_bits is not smaller than the lane of bits.
+    return ((other_bits | guards) - bits) & guards == guards
+
+
+def _merge_max(bits: int, other_bits: int, size: int) -> int:
+    """The counter-wise maximum of both packed filters."""
+    guards = _guard_bits(size)
+    # guard bit set in every lane where bits >= other_bits,
+    #  spread to a mask over the whole lane to select bits there.
+    is_larger = ((bits | guards) - other_bits) & guards
+    select = (is_larger >> (_COUNTER_BITS - 1)) * _LANE_MASK
+    return other_bits ^ ((bits ^ other_bits) & select)
+
+
+@functools.lru_cache(maxsize=8192)
+def _positions(id_: str, size: int, num_hash_functions: int) -> int:
+    """
+    Compute the packed update setting the counters of an id to one.
+
+    Uses double hashing: the two halves h1, h2 of a single blake2b digest
+    give the positions (h1 + i * h2) % size for i < num_hash_functions.
+    Cached, as the same ids are hashed repeatedly.
+    """
+    digest = hashlib.blake2b(id_.encode(), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    # an odd step cycles through all positions of power of two sizes.
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    # for power of two sizes the modulo is a cheaper bit mask.
+    is_power_of_two = size & (size - 1) == 0
+    update = 0
+    for i in range(num_hash_functions):
+        value = h1 + i * h2
+        if is_power_of_two:
+            pos = value & (size - 1)
+        else:
+            pos = value % size
+        update |= 1 << (pos * _COUNTER_BITS)
+    return update
 
 
 class BloomTimestamp:
     """Represents a bloom clock timestamp with a bloom filter and logical counter."""
 
+    __slots__ = ("_bits", "_size")
+
     def __init__(self, bloom_filter: list[int]):
         """
         Initialize a bloom timestamp.
 
         Args:
-            bloom_filter: List of bits representing the bloom filter state
+            bloom_filter: List of counters representing the bloom filter state
+
+        Raises a ValueError if a counter is negative or exceeds _COUNTER_MAX.
         """
-        self._filter = bloom_filter[:]  # Copy to avoid external modifications
+        # array("H") matches the 16 bit lanes,
+        #  so its raw bytes are the packed representation.
+        try:
+            counters = array.array("H", bloom_filter)
+        except OverflowError:
+            raise ValueError(
+                f"bloom filter counter out of range: {bloom_filter}")
+        bits = int.from_bytes(counters.tobytes(), sys.byteorder)
+        if bits & _guard_bits(len(counters)):
+            raise ValueError(
+                f"bloom filter counter out of range: {bloom_filter}")
+        self._bits = bits
+        self._size = len(counters)
+
+    @classmethod
+    def _from_bits(cls, bits: int, size: int) -> Self:
+        """Create a timestamp directly from the packed representation."""
+        timestamp = cls.__new__(cls)
+        timestamp._bits = bits
+        timestamp._size = size
+        return timestamp
 
     @property
     def filter(self):
-        """Returns a copy of the current bloom filter as a list"""
-        return self._filter[:]
+        """
+        Returns the bloom filter as a new list.
+
+        The list is expanded from the packed representation,
+        so internal operations use _bits instead.
+        """
+        return array.array(
+            "H",
+            self._bits.to_bytes(self._size * 2, sys.byteorder)).tolist()
 
     @classmethod
     def from_list(cls, filter: list[int]) -> Self:
@@ -34,28 +131,35 @@ class BloomTimestamp:
 
     def to_list(self) -> list[int]:
         """Convert the timestamp to a list (the bloom filter)"""
-        return self.filter[:]
+        return self.filter
+
+    def popcount(self) -> int:
+        """Returns the number of positions with a nonzero counter."""
+        guards = _guard_bits(self._size)
+        # adding 0x7fff to each lane carries into its guard bit iff the lane is nonzero.
+        return ((self._bits + guards - (guards >> (_COUNTER_BITS - 1))) & guards).bit_count()
 
     def __eq__(self, other) -> bool:
-        return self._filter == other._filter 
+        if not isinstance(other, BloomTimestamp):
+            return NotImplemented
+        return self._bits == other._bits and self._size == other._size
+
+    def __hash__(self) -> int:
+        return hash((self._bits, self._size))
 
     def __repr__(self):
-        return f"BloomTimestamp( filter=[{', '.join(map(str, self._filter))}])"
+        return f"BloomTimestamp( filter=[{', '.join(map(str, self.filter))}])"
 
     def __lt__(self, other: Self) -> bool:
         """
         Check if this bloom filter is a subset of another.
         This is used for causality comparison.
         """
-        if len(self._filter) != len(other._filter):
+        if self._size != other._size:
             raise ValueError("BloomTimestamps must be of the same size for comparison.")
-        return_value = False
-        for i in range(len(self._filter)):
-            if self._filter[i] < other._filter[i]:
-                return_value = True
-            elif self._filter[i] > other._filter[i]:
-                return False
-        return return_value
+        if self._bits == other._bits:
+            return False
+        return _is_subset(self._bits, other._bits, self._size)
 
     def is_concurrent(self, other: Self) -> bool:
         """
@@ -64,7 +168,13 @@ class BloomTimestamp:
 
         We consider a filter causal to itself.
         """
-        return not self < other and not other < self
+        if self._size != other._size:
+            raise ValueError("BloomTimestamps must be of the same size for comparison.")
+        if self._bits == other._bits:
+            return True
+        # the second subset test only runs if the first one fails.
+        return (not _is_subset(self._bits, other._bits, self._size)
+                and not _is_subset(other._bits, self._bits, self._size))
 
 
 class BloomClock:
@@ -91,9 +201,10 @@ class BloomClock:
         self._node_id = node_id
         self._filter_size = bloom_filter_size
         self._num_hash_functions = num_hash_functions
-        self._current_timestamp = BloomTimestamp(
-            [0] * bloom_filter_size
-        )
+        # packed filter, the timestamp is only created on request.
+        self._current_bits = 0
+        # timestamp of _current_bits, None until requested.
+        self._timestamp_cache = None
 
     @classmethod
     def create_new(
@@ -118,49 +229,30 @@ class BloomClock:
             num_hash_functions=num_hash_functions,
         )
 
-    def _hash_id_with_function(self, id_: str, hash_function_index: int) -> int:
+    def _hash_id(self,  id_: str) -> int:
         """
-        Hash an id using one of the independent hash functions.
+        Compute the packed update setting the k counters of an id to one.
 
         Args:
-            id: The id to hash (typically a element/event ID)
-            hash_function_index: Which hash function to use
-                                (0 to num_hash_functions-1)
+            id_: The id to hash (typically an event ID)
 
         Returns:
-            A position in the bloom filter (0 to filter_size-1)
-        """
-        # Create a unique hash input by combining element and hash function index
-        hash_input = f"{id_}:{hash_function_index}".encode()
-        hash_obj = hashlib.md5(hash_input)
-        hash_value = int(hash_obj.hexdigest(), 16)
-        return hash_value % self._filter_size
-
-    def _hash_id(self,  id_: str) -> list[int]:
-        """
-        Set the k bits corresponding to an element in the bloom filter.
-
-        Args:
-            filter_bits: The bloom filter to modify (in-place)
-            element: The element to add (typically node ID)
+            The packed filter to be added to the current filter.
         """
-        filter = [0] * self._filter_size
-        for i in range(self._num_hash_functions):
-            pos = self._hash_id_with_function(id_, i)
-            filter[pos] = 1
-        return filter
+        return _positions(id_, self._filter_size, self._num_hash_functions)
 
     def increment(self, event_id: str):
         """
         Increment the clock for a local event.
         Updates the bloom filter with the events id.
+
+        Raises an OverflowError if a counter would exceed _COUNTER_MAX.
         """
-        update = self._hash_id(event_id)
-        new_filter = [0] * self._filter_size
-        for position in range(self._filter_size):
-            new_filter[position] = (self._current_timestamp.filter[position]
-                                    + update[position])
-        self._current_timestamp = BloomTimestamp(new_filter)
+        bits = self._current_bits + self._hash_id(event_id)
+        if bits & _guard_bits(self._filter_size):
+            raise OverflowError("bloom filter counter overflow")
+        self._current_bits = bits
+        self._timestamp_cache = None
 
     def update(self, other: BloomTimestamp):
         """
@@ -169,16 +261,19 @@ class BloomClock:
 
         Args:
             other: The bloom timestamp received from another node
-        """
-        merged_filter = [0]*self._filter_size
-        for position in range(self._filter_size):
-            merged_filter[position] = max(
-                self._current_timestamp.filter[position],
-                other.filter[position])
 
-        self._current_timestamp = BloomTimestamp(merged_filter)
+        Raises a ValueError if other is not of the clock's filter size.
+        """
+        if other._size != self._filter_size:
+            raise ValueError("BloomTimestamps must be of the same size for comparison.")
+        self._current_bits = _merge_max(
+            self._current_bits, other._bits, self._filter_size)
+        self._timestamp_cache = None
 
     @property
     def current_timestamp(self) -> BloomTimestamp:
         """Get the current bloom clock timestamp"""
-        return self._current_timestamp
+        if self._timestamp_cache is None:
+            self._timestamp_cache = BloomTimestamp._from_bits(
+                self._current_bits, self._filter_size)
+        return self._timestamp_cache
@@ -34,6 +34,22 @@ class TestBloomTimestamp(unittest.TestCase):
         self.assertEqual(ts1, ts2)
         self.assertNotEqual(ts1, ts3)
 
+    def test_timestamp_hash(self):
+        """Equal timestamps can be used as the same dict key."""
+        ts1 = BloomTimestamp([1, 0, 1])
+        ts2 = BloomTimestamp([1, 0, 1])
+        ts3 = BloomTimestamp([1, 1, 1])
+        self.assertEqual(hash(ts1), hash(ts2))
+        self.assertEqual(len({ts1, ts2, ts3}), 2)
+        self.assertNotEqual(ts1, None)
+        self.assertNotIn(ts1, {None, "ts1"})
+
+    def test_popcount(self):
+        """popcount counts the positions with a nonzero counter."""
+        self.assertEqual(BloomTimestamp([0, 0, 0]).popcount(), 0)
+        self.assertEqual(BloomTimestamp([1, 0, 3]).popcount(), 2)
+        self.assertEqual(BloomTimestamp([32767, 1, 2, 0]).popcount(), 3)
+
     def test_lt_relation(self):
         """BloomTimestamp has a  <  showing causality.
 
@@ -59,6 +75,27 @@ class TestBloomTimestamp(unittest.TestCase):
         ts4 = BloomTimestamp([1, 1, 0])
         # ts3 is subset of ts4 -> not concurrent
         self.assertFalse(ts3.is_concurrent(ts4))
+        self.assertFalse(ts4.is_concurrent(ts3))
+        # equal filters are reported concurrent, as neither is smaller.
+        self.assertTrue(ts3.is_concurrent(BloomTimestamp([1, 0, 0])))
+
+    def test_lt_relation_counters(self):
+        """Causality compares the counters of every position."""
+        timestamp0 = BloomTimestamp([2, 0, 7])
+        timestamp1 = BloomTimestamp([2, 1, 9])
+        timestamp2 = BloomTimestamp([3, 1, 8])
+
+        self.assertTrue(timestamp0 < timestamp1)
+        self.assertTrue(timestamp0 < timestamp2)
+        self.assertFalse(timestamp1 < timestamp2)
+        self.assertFalse(timestamp2 < timestamp1)
+
+    def test_counter_out_of_range(self):
+        """Counters must fit into the packed representation."""
+        with self.assertRaises(ValueError):
+            BloomTimestamp([0, -1, 0])
+        with self.assertRaises(ValueError):
+            BloomTimestamp([0, 2**15, 0])
 
 
 class TestBloomClock(unittest.TestCase):
@@ -85,7 +122,7 @@ class TestBloomClock(unittest.TestCase):
         clock = BloomClock(node_id=0, bloom_filter_size=256, num_hash_functions=4)
         clock.increment(event_id)
         # Bloom filter should have some bits set from hashing the node_id
-        self.assertTrue(any(bit == 1 for bit in clock.current_timestamp.filter))
+        self.assertTrue(clock.current_timestamp.popcount() > 0)
 
     def test_increment_monotonic(self):
         """Test that counter is monotonically increasing."""
@@ -122,6 +159,29 @@ class TestBloomClock(unittest.TestCase):
         # Counter should be updated and incremented
         self.assertLess(timestamp1, clock1.current_timestamp)
 
+    def test_update_merges_maximum(self):
+        """Updating keeps the larger counter of each position."""
+        clock = BloomClock(node_id=0, bloom_filter_size=4, num_hash_functions=1)
+        clock.update(BloomTimestamp([3, 0, 1, 0]))
+        clock.update(BloomTimestamp([1, 2, 1, 0]))
+        self.assertEqual(clock.current_timestamp.filter, [3, 2, 1, 0])
+
+    def test_update_size_mismatch(self):
+        """Updating with a timestamp of another size raises a ValueError."""
+        clock = BloomClock(node_id=0, bloom_filter_size=4, num_hash_functions=1)
+        with self.assertRaises(ValueError):
+            clock.update(BloomTimestamp([1, 1]))
+        with self.assertRaises(ValueError):
+            clock.update(BloomTimestamp([1] * 8))
+        self.assertEqual(clock.current_timestamp.filter, [0, 0, 0, 0])
+
+    def test_increment_overflow(self):
+        """Incrementing a saturated counter raises an OverflowError."""
+        clock = BloomClock(node_id=0, bloom_filter_size=1, num_hash_functions=1)
+        clock.update(BloomTimestamp([2**15 - 1]))
+        with self.assertRaises(OverflowError):
+            clock.increment("deadbeef")
+
     def test_causality_tracking(self):
         """Test that bloom clock tracks causality correctly."""
         clock0 = BloomClock(node_id=0,
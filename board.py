@@ -1,6 +1,8 @@
 
 
 class Entry:
+    __slots__ = ("number", "id", "value")
+
     def __init__(self,
                  number,
                  id,
@@ -13,13 +15,15 @@ class Entry:
         return {"id": self.id, "value": self.value}
 
     def __str__(self):
-        return f"{{{self.value}, {self.id}, {self.value}}}"
+        return f"{{{self.number}, {self.id}, {self.value}}}"
 
 
 class Board:
     def __init__(self):
         self._entry_number = 0
         self._indexed_entries = {}
+        # list of the ordered entries, None if invalidated by a mutation.
+        self._ordered_cache = None
 
     def add_entry(self, entry_id: str, value: str):
         """ add a new entry to the board.
@@ -34,6 +38,7 @@ class Board:
                 entry_id,
                 value)
             self._entry_number += 1
+            self._ordered_cache = None
 
     def update_entry(self, entry_id: str, value: str):
         """
@@ -47,6 +52,15 @@ class Board:
             raise KeyError(
                 f"Entry {entry_id} doesn't exist yet and can't be updated.")
 
+    def update_or_create_entry(self, entry_id: str, value: str):
+        """
+        updates an entry, or adds it if it doesn't exist yet.
+        """
+        if entry_id in self._indexed_entries:
+            self.update_entry(entry_id, value)
+        else:
+            self.add_entry(entry_id, value)
+
     def delete_entry(self, id):
         """
         deletes an entry.
@@ -57,11 +71,30 @@ class Board:
             del self._indexed_entries[id]
         except KeyError:
             raise KeyError(f"No entry with id {id}")
+        self._ordered_cache = None
 
     def get_ordered_entries(self):
-        return sorted(
-            list(self._indexed_entries.values()),
-            key=lambda e: e.number)
+        """
+        returns the list of entries in order.
+
+        the list is shared between calls until the board changes,
+        so it must not be modified.
+        """
+        # entries are only ever inserted with increasing numbers and
+        #  updates don't reorder the dict, so insertion order is the order.
+        # updates change the Entry objects in place,
+        #  so only adding and deleting invalidates the cache.
+        if self._ordered_cache is None:
+            self._ordered_cache = list(self._indexed_entries.values())
+        return self._ordered_cache
+
+    def iter_ordered_entries(self):
+        """
+        returns a live view of the ordered entries, without copying them.
+
+        the board must not be modified while iterating it.
+        """
+        return self._indexed_entries.values()
 
     def get_number_of_entries(self):
         return len(self._indexed_entries)
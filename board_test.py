@@ -120,3 +120,61 @@ class TestBoard(ut.TestCase):
                 "ad32e3f4fb450922ad32e3f4fb450922")
         self.assertEqual(board.get_number_of_entries(), 0)
         self.assertEqual(len(board.get_ordered_entries()), 0)
+
+    def test_ordered_entries_after_recreate(self):
+        """
+        a deleted and added again entry is ordered after existing entries.
+        """
+        board = Board()
+        board.add_entry("ad32e3f4fb450922ad32e3f4fb450922", "Entry 0")
+        board.add_entry("e3f4fb450922ad32e3f4fb450922ad32", "Entry 1")
+        board.update_entry("ad32e3f4fb450922ad32e3f4fb450922", "Entry 0b")
+        self.assertEqual(
+            [entry.value for entry in board.get_ordered_entries()],
+            ["Entry 0b", "Entry 1"])
+        board.delete_entry("ad32e3f4fb450922ad32e3f4fb450922")
+        board.add_entry("ad32e3f4fb450922ad32e3f4fb450922", "Entry 2")
+        self.assertEqual(
+            [entry.value for entry in board.get_ordered_entries()],
+            ["Entry 1", "Entry 2"])
+
+    def test_update_or_create_entry(self):
+        """
+        update_or_create_entry adds a missing entry and updates an existing one.
+        """
+        board = Board()
+        board.update_or_create_entry(
+            "ad32e3f4fb450922ad32e3f4fb450922", "Create Entry")
+        self.assertEqual(board.get_number_of_entries(), 1)
+        board.update_or_create_entry(
+            "ad32e3f4fb450922ad32e3f4fb450922", "Update Entry")
+        self.assertEqual(board.get_number_of_entries(), 1)
+        self.assertEqual(board.get_ordered_entries()[0].value, "Update Entry")
+
+    def test_iter_ordered_entries(self):
+        """
+        iter_ordered_entries iterates the entries in the same order as
+        get_ordered_entries.
+        """
+        board = Board()
+        board.add_entry("ad32e3f4fb450922ad32e3f4fb450922", "Entry 0")
+        board.add_entry("e3f4fb450922ad32e3f4fb450922ad32", "Entry 1")
+        self.assertEqual(
+            list(board.iter_ordered_entries()), board.get_ordered_entries())
+
+    def test_ordered_entries_cached(self):
+        """
+        get_ordered_entries reuses its list until an entry is added or deleted.
+        """
+        board = Board()
+        board.add_entry("ad32e3f4fb450922ad32e3f4fb450922", "Entry 0")
+        ordered_entries = board.get_ordered_entries()
+        board.update_entry("ad32e3f4fb450922ad32e3f4fb450922", "Entry 0b")
+        self.assertIs(board.get_ordered_entries(), ordered_entries)
+        self.assertEqual(board.get_ordered_entries()[0].value, "Entry 0b")
+
+        board.add_entry("e3f4fb450922ad32e3f4fb450922ad32", "Entry 1")
+        self.assertEqual(len(board.get_ordered_entries()), 2)
+        board.delete_entry("ad32e3f4fb450922ad32e3f4fb450922")
+        self.assertEqual(
+            [entry.value for entry in board.get_ordered_entries()], ["Entry 1"])
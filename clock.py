@@ -17,61 +17,115 @@ class IClock:
         raise NotImplementedError()
 
 
+class SharedTime:
+    """
+    A time which can be shared by several ExternalDeterminedClocks.
+
+    Setting it once advances all clocks reading from it.
+    """
+
+    __slots__ = ("time",)
+
+    def __init__(self):
+        self.time = 0.0
+
+    def set_time(self, time: float):
+        """
+        Set the time, raises a ValueError if it would go backwards.
+
+        The check is skipped under python -O.
+        """
+        if __debug__ and time < self.time:
+            raise ValueError(f"time must not decrease: {time} < {self.time}")
+        self.time = time
+
+
 class ExternalDeterminedClock(IClock):
     """
     Default clock class.
+
+    Reads its time from shared_time,
+    or from a private SharedTime if none is given.
     """
 
-    def __init__(self):
-        self._time = 0.0
+    def __init__(self, shared_time: SharedTime | None = None):
+        if shared_time is None:
+            shared_time = SharedTime()
+        self._shared_time = shared_time
 
     def set_time(self, time: float):
         """
         Set the time which the following calls to get_time will return.
+
+        The time is set on the clock's SharedTime, so for a clock of the
+        default factory of a ClockServer it moves every clock of that
+        factory, like ClockServer.advance_time.
         """
-        assert time >= self._time
-        self._time = time
+        self._shared_time.set_time(time)
 
     def get_time(self) -> float:
         """
         returns the time.
         Is guaranteed to deliver a monoton increasing time.
         """
-        return self._time
+        return self._shared_time.time
 
 
-class ClockServer:
+class _ClockDict(dict):
+    """
+    dict of clocks by node id, creating missing clocks with the factory.
+    """
+
     def __init__(self, factory: Callable[[int], IClock]):
-        self._clocks = {}
-        self._clock_factory = factory
+        super().__init__()
+        self._factory = factory
+
+    def __missing__(self, node_id: int) -> IClock:
+        clock = self._factory(node_id)
+        self[node_id] = clock
+        return clock
+
+
+class ClockServer:
+    def __init__(self, factory: Callable[[int], IClock] | None = None):
+        self.set_clock_factory(factory)
 
     def get_clock_for_node(self, node_id: int) -> IClock:
         """
         Get a clock for a specific node.
         """
-        if node_id not in self._clocks:
-            self._clocks[node_id] = self._clock_factory(node_id)
         return self._clocks[node_id]
 
     def all_clocks(self) -> Iterable[tuple[int,IClock]]:
         """
-        Returns a generator for all already created clocks.
+        Returns an iterable over all already created clocks.
         """
-        for node_id, clock in self._clocks.items():
-            yield node_id, clock
+        return self._clocks.items()
 
-    def set_clock_factory(self, factory: Callable[[int], IClock]):
+    def set_clock_factory(self, factory: Callable[[int], IClock] | None = None):
         """
         Set a factory for clocks.
 
-        Clears all already created clocks.
+        Clears all already created clocks and resets the shared time.
         New calls to get_clock_for_node will create new clocks,
         however previously retrieved clocks outside this class remain valid.
+        Without a factory, ExternalDeterminedClocks are created,
+        which all share one time driven by advance_time.
 
         intended for testing.
         """
-        self._clock_factory = factory
-        self._clocks = {}
+        shared_time = SharedTime()
+        self._shared_time = shared_time
+        if factory is None:
+            def factory(node_id: int) -> IClock:
+                return ExternalDeterminedClock(shared_time)
+        self._clocks = _ClockDict(factory)
+
+    def advance_time(self, time: float):
+        """
+        Set the time of all clocks created by the default factory at once.
+        """
+        self._shared_time.set_time(time)
 
 
-clock_server = ClockServer(lambda n: ExternalDeterminedClock())
+clock_server = ClockServer()
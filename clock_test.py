@@ -0,0 +1,41 @@
+import unittest as ut
+from clock import ClockServer, ExternalDeterminedClock
+
+
+class TestClockServer(ut.TestCase):
+    def test_advance_time(self):
+        """
+        advance_time sets the time of all clocks created by the default factory.
+        """
+        server = ClockServer()
+        clock_0 = server.get_clock_for_node(0)
+        clock_1 = server.get_clock_for_node(1)
+
+        server.advance_time(1.5)
+
+        self.assertEqual(clock_0.get_time(), 1.5)
+        self.assertEqual(clock_1.get_time(), 1.5)
+        self.assertEqual(server.get_clock_for_node(2).get_time(), 1.5)
+
+    def test_set_clock_factory_resets_time(self):
+        """
+        set_clock_factory starts a new shared time and leaves custom clocks alone.
+        """
+        server = ClockServer()
+        server.advance_time(2.0)
+        server.set_clock_factory()
+        self.assertEqual(server.get_clock_for_node(0).get_time(), 0.0)
+
+        server.set_clock_factory(lambda n: ExternalDeterminedClock())
+        clock = server.get_clock_for_node(0)
+        server.advance_time(3.0)
+        self.assertEqual(clock.get_time(), 0.0)
+
+    def test_advance_time_backwards(self):
+        """
+        advance_time rejects a time before the current one.
+        """
+        server = ClockServer()
+        server.advance_time(2.0)
+        with self.assertRaises(ValueError):
+            server.advance_time(1.0)
@@ -6,8 +6,12 @@ Implements events encoding the actions that can be applied in a transaction.
 # In commit f07ae884a999aa2c9415c1a4d793b1a15a8b6b29
 # exists an sqlite implementation for event sourcing.
 
+import struct
+
 
 class Event:
+    __slots__ = ("_event_id", "_entry_id", "_action", "_value", "_bytes")
+
     def __init__(self, event_id, entry_id,
                  action, value):
         # The unique id of this event
@@ -18,6 +22,8 @@ class Event:
         self._action = action
         # Usually the new value of the entry; "" for Deletion events.
         self._value = str(value)
+        # Cached result of _to_bytes, events are immutable.
+        self._bytes = None
         # ids of events on which this event depends.
 
     @property
@@ -37,10 +43,16 @@ class Event:
         return self._value
 
     def __eq__(self, other):
-        return all([(self._event_id == other._event_id),
-                    (self._entry_id == other._entry_id),
-                    (self._action == other._action),
-                    (self._value == other._value)])
+        if not isinstance(other, Event):
+            return NotImplemented
+        # tuple comparison stops at the first differing field.
+        return ((self._event_id, self._entry_id, self._action, self._value)
+                == (other._event_id, other._entry_id,
+                    other._action, other._value))
+
+    def __hash__(self):
+        # event ids are unique, equal events always share it.
+        return hash(self._event_id)
 
     @staticmethod
     def from_dict(dict_):
@@ -54,6 +66,18 @@ class Event:
         return (f";{self._event_id};{self._entry_id};"
                 f"{self._action};{self._value};")
 
+    def _to_bytes(self):
+        """binary serialization, used to compute block hashes."""
+        if self._bytes is None:
+            buf = bytearray()
+            for field in (self._event_id, self._entry_id,
+                          self._action, self._value):
+                encoded = str(field).encode()
+                buf += struct.pack("<I", len(encoded))
+                buf += encoded
+            self._bytes = bytes(buf)
+        return self._bytes
+
     def to_dict(self):
         return {"event_id": self._event_id,
                 "entry_id": self._entry_id,
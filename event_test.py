@@ -16,4 +16,14 @@ class TestEvent(ut.TestCase):
         event1 = Event.from_dict(event0.to_dict())
         self.assertEqual(event0, event1)
 
-
+    def test_equality_and_hash(self):
+        """
+        Events are equal if all fields are equal and can be used in sets.
+        """
+        event0 = Event("cc6df142", "d103ba6d", "create", "Entry")
+        event1 = Event("cc6df142", "d103ba6d", "create", "Entry")
+        event2 = Event("cc6df142", "d103ba6d", "update", "Entry")
+        self.assertEqual(event0, event1)
+        self.assertNotEqual(event0, event2)
+        self.assertEqual(len({event0, event1, event2}), 2)
+        self.assertNotEqual(event0, None)
@@ -1,11 +1,12 @@
-import uuid
+import os
 
 
 class RandomGenerator:
     """Generator to generate random ids."""
 
     def generate(self):
-        return uuid.uuid4().hex
+        # 128 random bits, the same format as uuid4().hex without the UUID object.
+        return os.urandom(16).hex()
 
 
 class NodeAwareGenerator:
@@ -15,8 +16,10 @@ class NodeAwareGenerator:
         self._i = 0
         self._max_node_id = max_node_id
         self._node_id = node_id
+        # the low bits hold the node id, wide enough for max_node_id.
+        self._shift = max_node_id.bit_length()
 
     def generate(self):
-        new_id = self._i * (self._max_node_id+1) + self._node_id
+        new_id = (self._i << self._shift) | self._node_id
         self._i += 1
         return f"{new_id:032X}"
@@ -12,3 +12,21 @@ class TestRandomGenerator(ut.TestCase):
  
         self.assertEqual(len(ids), n)
 
+    def test_id_format(self):
+        """ids are 32 lowercase hex digits."""
+        new_id = RandomGenerator().generate()
+        self.assertEqual(len(new_id), 32)
+        self.assertEqual(new_id, f"{int(new_id, 16):032x}")
+
+
+class TestNodeAwareGenerator(ut.TestCase):
+    def test_unique_ids_across_nodes(self):
+        """ids of different nodes never collide."""
+        max_node_id = 4
+        generators = [NodeAwareGenerator(node_id, max_node_id)
+                      for node_id in range(max_node_id + 1)]
+        n = 100
+        ids = set(generator.generate()
+                  for _ in range(n) for generator in generators)
+
+        self.assertEqual(len(ids), n * len(generators))
@@ -1,6 +1,9 @@
 """ """
 
+import collections
+import heapq
 import logging
+import math
 from typing import List, Any
 from transport import NetworkMessage, MessageQueue, Transport, UnreliableTransport
 from clock import IClock
@@ -32,23 +35,21 @@ class MessengerMessage:
     Message wrapping a higher level message.
     """
 
+    __slots__ = ("source", "destination", "content")
+
     @staticmethod
-    def from_dictionary(dictionary):
-        return MessengerMessage(
-            dictionary["source"], dictionary["destination"], dictionary["content"]
-        )
+    def from_tuple(tuple_):
+        """tuple_ may also be a list, as tuples are sent as lists."""
+        source, destination, content = tuple_
+        return MessengerMessage(source, destination, content)
 
     def __init__(self, source, destination, content):
         self.source = source
         self.destination = destination
         self.content = content
 
-    def as_dictionary(self):
-        return {
-            "source": self.source,
-            "destination": self.destination,
-            "content": self.content,
-        }
+    def as_tuple(self):
+        return (self.source, self.destination, self.content)
 
 
 class Messenger:
@@ -59,47 +60,40 @@ class Messenger:
     def __init__(self, own_id, num_out: int):
         self.own_id = own_id
         self.in_queue = MessageQueue()
-        self.out_queues = {i: MessageQueue() for i in range(num_out)}
+        self.out_queues = [MessageQueue() for _ in range(num_out)]
 
     def send(self, destination, content: Any):
-        assert destination in self.out_queues
+        assert 0 <= destination < len(self.out_queues)
         msg = MessengerMessage(self.own_id, destination, content)
-        self.out_queues[destination].put(NetworkMessage(msg.as_dictionary()))
+        self.out_queues[destination].put(NetworkMessage(msg.as_tuple()))
 
     def has_message(self) -> bool:
         return not self.in_queue.empty()
 
     def receive(self) -> List[tuple[int, Any]]:
         contents = []
-        while not self.in_queue.empty():
-            logger.info("Messenger {} received message".format(self.own_id))
-            msg = MessengerMessage.from_dictionary(self.in_queue.get().get_content())
+        log_received = logger.isEnabledFor(logging.DEBUG)
+        for network_message in self.in_queue.drain():
+            if log_received:
+                logger.debug("Messenger %s received message", self.own_id)
+            msg = MessengerMessage.from_tuple(network_message.get_content())
             contents.append((msg.source, msg.content))
         return contents
 
 
-class StreamBuffer:
+class OutBuffer:
     """
-    Buffer for ReliableMessenger to hold outbound messages.
+    Buffer for a Connection to hold outbound messages until acknowledged.
 
     The Buffer holds a fixed amount (capacity)  values,
      however it indexes them from the beginning of all values ever inserted
     """
 
-    class EmptySentinel:
-        def __repr__(self):
-            return "<empty>"
-
-        def __str__(self):
-            return "empty"
-
-    empty = EmptySentinel()  # special object, denoting empty slot.
-
     def __init__(self, capacity):
         self._capacity = capacity
-        self._values = [self.empty for i in range(self._capacity)]
+        # the values currently in the buffer, the first one has index _start.
+        self._values = collections.deque()
         self._start = 0
-        self._size = 0
 
     @property
     def capacity(self):
@@ -116,12 +110,12 @@ class StreamBuffer:
     @property
     def size(self):
         """Number of values currently in the buffer"""
-        return self._size
+        return len(self._values)
 
     @property
     def end(self):
         """One after the last message currently in the buffer."""
-        return self._start + self._size
+        return self._start + len(self._values)
 
     def __getitem__(self, i):
         """
@@ -131,10 +125,8 @@ class StreamBuffer:
         """
         if i < self._start:
             raise IndexError()
-        elif i > self._start + self._size:
-            raise IndexError()
-        else:
-            return self._values[(i) % self._capacity]
+        # the deque raises the IndexError for i >= end.
+        return self._values[i - self._start]
 
     def __setitem__(self, i, value):
         """
@@ -144,50 +136,90 @@ class StreamBuffer:
         """
         if i < self._start:
             raise IndexError()
-        elif i > self._start + self._size:
-            raise IndexError()
-        else:
-            self._values[(i) % self._capacity] = value
+        self._values[i - self._start] = value
+
+    def _get_unchecked(self, i):
+        """__getitem__ for an i known to be in the buffer, from start to end."""
+        return self._values[i - self._start]
+
+    def _set_unchecked(self, i, value):
+        """__setitem__ for an i known to be in the buffer, from start to end."""
+        self._values[i - self._start] = value
 
     def drop(self):
         """
         Remove and return the value with the lowest index from the buffer.
         """
-        value = self._values[(self._start) % self._capacity]
-        self._values[(self._start) % self._capacity] = self.empty
+        value = self._values.popleft()
         self._start += 1
-        self._size -= 1
         return value
 
+    def advance(self, n):
+        """
+        Remove the n values with the lowest indices from the buffer.
+        """
+        if n > len(self._values):
+            raise IndexError()
+        values = self._values
+        for _ in range(n):
+            values.popleft()
+        self._start += n
+
     def append(self, value):
         """
         Append another value to the buffer.
 
         Throws an Out of OutOfResourceError if not enough slots in the buffer.
         """
-        if self._size >= self._capacity:
+        if len(self._values) >= self._capacity:
             raise OutOfResourceError("Buffer full")
-        self._values[(self._start + self._size) % self._capacity] = value
-        self._size += 1
+        self._values.append(value)
 
-    def create_empty_slot(self):
-        self.append(self.empty)
 
+class InBuffer:
+    """
+    Buffer for a Connection to hold inbound messages received out of order.
 
-class ConnectionMessage:
-    @staticmethod
-    def from_dictionary(dictionary):
-        return ConnectionMessage(
-            dictionary["typ"], dictionary["value"], dictionary["content"]
-        )
+    Indexes values like the OutBuffer, from the beginning of all values ever received.
+    Only values within capacity of start can be stored.
+    """
 
-    def __init__(self, typ, value, content):
-        self.typ = typ
-        self.value = value
-        self.content = content
+    def __init__(self, capacity):
+        self._capacity = capacity
+        # the received values by index, missing ones are not yet received.
+        self._values = {}
+        self._start = 0
 
-    def as_dictionary(self):
-        return {"typ": self.typ, "value": self.value, "content": self.content}
+    @property
+    def start(self):
+        """Index of the first value not yet dropped.
+
+        0-indexed
+        """
+        return self._start
+
+    def __setitem__(self, i, value):
+        """
+        Store the value with index i.
+
+        throws an IndexError if i is before start or not within capacity.
+        """
+        if i < self._start or i >= self._start + self._capacity:
+            raise IndexError()
+        self._values[i] = value
+
+    def drop_filled(self):
+        """
+        Remove and return the values from start up to the first missing one as a list.
+        """
+        values = self._values
+        i = self._start
+        filled = []
+        while i in values:
+            filled.append(values.pop(i))
+            i += 1
+        self._start = i
+        return filled
 
 
 class Connection:
@@ -201,17 +233,19 @@ class Connection:
         own_id,
         remote_id,
         out_queue,
-        messenger_message_factory,
         window_size=WINDOW_SIZE,
         timeout=TIMEOUT,
     ):
         self.own_id = own_id
         self.remote_id = remote_id
         self.out_queue = out_queue
-        self._out_buffer = StreamBuffer(window_size)
-        self._in_buffer = StreamBuffer(window_size)
+        self._out_buffer = OutBuffer(window_size)
+        self._in_buffer = InBuffer(window_size)
         self._timeout = timeout
-        self._messenger_message_factory = messenger_message_factory
+        # acknowledgement to send on the next flush_ack, None if there is none.
+        self._pending_ack = None
+        # no message in the out_buffer times out before this time.
+        self._next_timeout = math.inf
 
     def send(self, content: Any, time: float):
         """
@@ -219,53 +253,58 @@ class Connection:
 
         Content must be serilizable.
         """
+        timeout_time = time + self._timeout
         try:
-            self._out_buffer.append((time + self._timeout, content))
+            self._out_buffer.append((timeout_time, content))
         except IndexError:
             raise OutOfResourceError("No space in the out_buffer. Try again later")
         else:
+            self._next_timeout = min(self._next_timeout, timeout_time)
             self._send_content(self._out_buffer.end, content)
 
-    def receive(self, message_dict, time) -> List[Any]:
+    def receive(self, message, time) -> List[Any]:
         """
         Handle receiving a message.
 
-        message_dict must be a dictionary,
-          that can be loaded into a ConnectionMessage.
+        message is the wire tuple (or list)
+          (source, destination, typ, value, content).
 
         time is the current time.
         """
-        message = ConnectionMessage.from_dictionary(message_dict)
-        if message.typ == "content":
-            if not (
-                self._in_buffer.size == 0
-                or (self._in_buffer[self._in_buffer.start] is self._in_buffer.empty)
-            ):
-                pass
-            if message.value > self._in_buffer.end:
-                for _ in range(self._in_buffer.end, message.value):
-                    self._in_buffer.create_empty_slot()
-            assert message.value > 0
-            try:
-                self._in_buffer[message.value - 1] = message.content
-            except IndexError:
-                pass
-            contents = []
-            next_to_send = self._in_buffer.start
-            for pos in range(self._in_buffer.start, self._in_buffer.end):
-                if self._in_buffer[pos] is not self._in_buffer.empty:
-                    next_to_send = pos + 1
-                    content = self._in_buffer.drop()
-                    contents.append(content)
-                else:
-                    break
-            self._send_ack(next_to_send)
-            return contents
-        elif message.typ == "ack":
-            self._receive_handle_ack(message.value, time)
-            return []
-        else:
-            raise Exception(f"unkown connection message type:{message.typ}")
+        _, _, typ, value, content = message
+        try:
+            handler = self._HANDLERS[typ]
+        except KeyError:
+            raise Exception(f"unkown connection message type:{typ}") from None
+        return handler(self, value, content, time)
+
+    def _receive_handle_content(self, value, content, time) -> List[Any]:
+        assert value > 0
+        try:
+            self._in_buffer[value - 1] = content
+        except IndexError:
+            pass
+        contents = self._in_buffer.drop_filled()
+        # acknowledgements are cumulative, only the latest one is sent.
+        self._pending_ack = self._in_buffer.start
+        return contents
+
+    @property
+    def next_timeout(self):
+        """
+        No message times out before this time, math.inf if none is waiting.
+        """
+        return self._next_timeout
+
+    def flush_ack(self):
+        """
+        Send the acknowledgement for all messages received since the last flush.
+
+        To be called after a batch of messages was received.
+        """
+        if self._pending_ack is not None:
+            self._send_ack(self._pending_ack)
+            self._pending_ack = None
 
     def wake_up(self, time):
         """
@@ -275,19 +314,31 @@ class Connection:
 
         - resends messages if timeout is reached.
         """
-        if self._out_buffer.size == 0:
-            # If no messages are waiting to be delivered, nothing to do.
+        if time < self._next_timeout:
+            # If no message has timed out yet, nothing to do.
+            #  Acknowledged messages can leave _next_timeout too early,
+            #  which only causes one scan that corrects it.
             return
         else:
-            for i in range(self._out_buffer.start, self._out_buffer.end):
-                timeout_time, content = self._out_buffer[i]
+            out_buffer = self._out_buffer
+            # i only runs over the buffer, so no bounds checks are needed.
+            get_value = out_buffer._get_unchecked
+            set_value = out_buffer._set_unchecked
+            send_content = self._send_content
+            resend_timeout_time = time + self._timeout
+            next_timeout = math.inf
+            for i in range(out_buffer.start, out_buffer.end):
+                timeout_time, content = get_value(i)
                 if timeout_time <= time:
-
-                    self._send_content(i + 1, content)
-                    self._out_buffer[i] = (time + self._timeout, content)
-
-    def _receive_handle_ack(self, ack, t):
-        logger.debug(f"received ack={ack}, at time {t}")
+                    send_content(i + 1, content)
+                    timeout_time = resend_timeout_time
+                    set_value(i, (timeout_time, content))
+                if timeout_time < next_timeout:
+                    next_timeout = timeout_time
+            self._next_timeout = next_timeout
+
+    def _receive_handle_ack(self, ack, content, t) -> List[Any]:
+        logger.debug("received ack=%s, at time %s", ack, t)
         if ack <= self._out_buffer.start:
             pass
         elif ack > self._out_buffer.end:
@@ -296,26 +347,24 @@ class Connection:
             #  We have no idea what happened on the other side.
             raise ProtocolError("acknowledged unsend message")
         else:
-            i = 0
-            while ack > self._out_buffer.start:
-                i += 1
-                self._out_buffer.drop()
+            self._out_buffer.advance(ack - self._out_buffer.start)
+        return []
 
     def _send_content(self, content_id, content):
-        msg = self._messenger_message_factory(
-            ConnectionMessage("content", content_id, content).as_dictionary()
-        )
-        logger.debug(f"Connection: content send:{msg.as_dictionary()}")
-        self.out_queue.put(NetworkMessage(msg.as_dictionary()))
+        wire_message = (self.own_id, self.remote_id, "content", content_id, content)
+        logger.debug("Connection: content send:%s", wire_message)
+        self.out_queue.put(NetworkMessage(wire_message))
 
     def _send_ack(self, value):
-        typ = "ack"
-        content = None
-        msg = self._messenger_message_factory(
-            ConnectionMessage(typ, value, content).as_dictionary()
-        )
-        logger.debug(f"Connection: ack send:{msg.as_dictionary()}")
-        self.out_queue.put(NetworkMessage(msg.as_dictionary()))
+        wire_message = (self.own_id, self.remote_id, "ack", value, None)
+        logger.debug("Connection: ack send:%s", wire_message)
+        self.out_queue.put(NetworkMessage(wire_message))
+
+    # handler for each message typ, called with (self, value, content, time).
+    _HANDLERS = {
+        "content": _receive_handle_content,
+        "ack": _receive_handle_ack,
+    }
 
 
 class ReliableMessenger:
@@ -330,26 +379,21 @@ class ReliableMessenger:
         self._own_id = own_id
         self.out_queues = out_queues
         self.in_queue = MessageQueue()
+        # heap of (next_timeout, remote_id) of connections to wake up,
+        #  entries can be outdated, which only causes an unneeded wake_up.
+        self._timeout_heap = []
 
     def _create_connections(self, own_id, num_out, timeout, window_size):
         connections = {}
-        out_queues = {}
+        # indexed by the destination id.
+        out_queues = [MessageQueue() for _ in range(num_out)]
         for i in range(num_out):
-            out_queues[i] = MessageQueue()
             if i == own_id:
                 continue
-
-            def make_messenger_message_factory(own_id, i):
-                def make_messenger_message(content):
-                    return MessengerMessage(own_id, i, content)
-
-                return make_messenger_message
-
             connections[i] = Connection(
                 own_id,
                 i,
                 out_queues[i],
-                make_messenger_message_factory(own_id, i),
                 timeout=timeout,
                 window_size=window_size,
             )
@@ -365,7 +409,12 @@ class ReliableMessenger:
         if destination == self._own_id:
             self._shortcut_buffer.append((self._own_id, content))
         else:
-            self._connections[destination].send(content, time)
+            connection = self._connections[destination]
+            next_timeout = connection.next_timeout
+            connection.send(content, time)
+            if connection.next_timeout < next_timeout:
+                heapq.heappush(
+                    self._timeout_heap, (connection.next_timeout, destination))
 
     def receive(self, time: float) -> List[tuple[int, Any]]:
         """
@@ -377,23 +426,40 @@ class ReliableMessenger:
         #  and then dispatches it to the relevant connection.
         #  connection then handles acknowledgments, out of order deliveries,
         #  missing messages.
-        #  This also means that a MessengerMessage needs to wrap a
-        #  ConnectionMessage, not the other way around.
-        #  Which is why the Messenger inject a messenger_message_factory into
-        #  Connection.
+        #  Both share one flat wire tuple
+        #  (source, destination, typ, value, content),
+        #  the messenger only reads the source from it.
         contents = self._shortcut_buffer
         self._shortcut_buffer = []
-        while not self.in_queue.empty():
-            logger.info("Messenger {} received message".format(self._own_id))
-            messenger_message = MessengerMessage.from_dictionary(
-                self.in_queue.get().get_content()
-            )
-            messages = self._connections[messenger_message.source].receive(
-                messenger_message.content, time
-            )
-            contents.extend(
-                [(messenger_message.source, content) for content in messages]
-            )
-        for connection in self._connections.values():
-            connection.wake_up(time)
+        # connections which received messages in this call, by remote id.
+        receiving = {}
+        connections = self._connections
+        append = contents.append
+        log_received = logger.isEnabledFor(logging.DEBUG)
+        for network_message in self.in_queue.drain_all():
+            if log_received:
+                logger.debug("Messenger %s received message", self._own_id)
+            message = network_message.get_content()
+            source = message[0]
+            connection = connections[source]
+            receiving[source] = connection
+            for content in connection.receive(message, time):
+                append((source, content))
+        for connection in receiving.values():
+            connection.flush_ack()
+        self._wake_up_due_connections(time)
         return contents
+
+    def _wake_up_due_connections(self, time: float):
+        """
+        Call wake_up on the connections with a message that may have timed out.
+        """
+        heap = self._timeout_heap
+        due = set()
+        while heap and heap[0][0] <= time:
+            due.add(heapq.heappop(heap)[1])
+        for remote_id in due:
+            connection = self._connections[remote_id]
+            connection.wake_up(time)
+            if connection.next_timeout != math.inf:
+                heapq.heappush(heap, (connection.next_timeout, remote_id))
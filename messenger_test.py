@@ -1,14 +1,17 @@
 import unittest as ut
 from unittest.mock import Mock
+import queue
 import random
 import logging
 import logging_config
 import sys
 from messenger import (
     Messenger,
-    MessengerMessage,
     ReliableMessenger,
     Connection,
+    InBuffer,
+    OutBuffer,
+    OutOfResourceError,
     UnreliableTransport,
     MessageQueue,
 )
@@ -20,28 +23,133 @@ class Object:
     pass
 
 
-class TestConnection(ut.TestCase):
-    def make_messenger_message_factory(self, own_id, i):
-        def make_messenger_message(content):
-            return MessengerMessage(own_id, i, content)
+class TestMessageQueue(ut.TestCase):
+    def test_fifo(self):
+        """messages are returned in the order they were put."""
+        message_queue = MessageQueue()
+        message_queue.put("a")
+        message_queue.put("b")
+        message_queue.put("c")
+        self.assertEqual(message_queue.qsize(), 3)
+        self.assertEqual(message_queue.get(), "a")
+        self.assertEqual(list(message_queue.drain()), ["b", "c"])
+        self.assertTrue(message_queue.empty())
+        with self.assertRaises(queue.Empty):
+            message_queue.get_nowait()
+
+    def test_drain_all(self):
+        """drain_all returns all queued messages at once."""
+        message_queue = MessageQueue()
+        message_queue.put("a")
+        message_queue.put("b")
+        self.assertEqual(message_queue.drain_all(), ["a", "b"])
+        self.assertEqual(message_queue.drain_all(), [])
+
+
+class TestOutBuffer(ut.TestCase):
+    def test_index_from_first_value(self):
+        """values keep their index after earlier values are dropped."""
+        buffer = OutBuffer(2)
+        buffer.append("a")
+        buffer.append("b")
+        with self.assertRaises(OutOfResourceError):
+            buffer.append("c")
+        self.assertEqual(buffer.drop(), "a")
+        buffer.append("c")
+        self.assertEqual((buffer.start, buffer.end), (1, 3))
+        self.assertEqual(buffer[2], "c")
+        with self.assertRaises(IndexError):
+            buffer[0]
+        with self.assertRaises(IndexError):
+            buffer[3]
+
+    def test_advance(self):
+        """advance drops several values at once."""
+        buffer = OutBuffer(3)
+        for value in "abc":
+            buffer.append(value)
+        buffer.advance(2)
+        self.assertEqual((buffer.start, buffer.size), (2, 1))
+        self.assertEqual(buffer[2], "c")
+        with self.assertRaises(IndexError):
+            buffer.advance(2)
+
+
+class TestInBuffer(ut.TestCase):
+    def test_drop_filled(self):
+        """drop_filled removes the values up to the first missing one."""
+        buffer = InBuffer(4)
+        buffer[0] = "a"
+        buffer[1] = "b"
+        buffer[3] = "d"
+        self.assertEqual(buffer.drop_filled(), ["a", "b"])
+        self.assertEqual(buffer.start, 2)
+        self.assertEqual(buffer.drop_filled(), [])
+        buffer[2] = "c"
+        self.assertEqual(buffer.drop_filled(), ["c", "d"])
+        self.assertEqual(buffer.start, 4)
+
+    def test_out_of_window(self):
+        """values before start or beyond the capacity are rejected."""
+        buffer = InBuffer(2)
+        buffer[0] = "a"
+        buffer.drop_filled()
+        with self.assertRaises(IndexError):
+            buffer[0] = "a"
+        with self.assertRaises(IndexError):
+            buffer[3] = "d"
 
-        return make_messenger_message
 
+class TestConnection(ut.TestCase):
     def test_simple_send(self):
         out_queue = MessageQueue()
-        conn = Connection(0, 1, out_queue, self.make_messenger_message_factory(0, 1))
+        conn = Connection(0, 1, out_queue)
         conn.send("Hello World", 0.0)
         self.assertFalse(out_queue.empty())
         message = out_queue.get()
+        # tuples are sent as lists.
         self.assertEqual(
             message.get_content(),
-            {
-                "source": 0,
-                "destination": 1,
-                "content": {"typ": "content", "value": 1, "content": "Hello World"},
-            },
+            [0, 1, "content", 1, "Hello World"],
         )
 
+    def test_coalesce_acks(self):
+        """only one acknowledgement is sent for several received messages."""
+        out_queue = MessageQueue()
+        conn = Connection(0, 1, out_queue)
+        self.assertEqual(conn.receive([1, 0, "content", 1, "Hello"], 0.0), ["Hello"])
+        self.assertEqual(conn.receive([1, 0, "content", 2, "World"], 0.0), ["World"])
+        self.assertTrue(out_queue.empty())
+
+        conn.flush_ack()
+        message = out_queue.get()
+        self.assertEqual(message.get_content(), [0, 1, "ack", 2, None])
+        self.assertTrue(out_queue.empty())
+
+        conn.flush_ack()
+        self.assertTrue(out_queue.empty())
+
+    def test_unknown_message_type(self):
+        """receiving a message of an unknown type raises."""
+        conn = Connection(0, 1, MessageQueue())
+        with self.assertRaises(Exception):
+            conn.receive([1, 0, "hello", 1, None], 0.0)
+
+    def test_wake_up_resends_after_timeout(self):
+        """wake_up only resends messages whose timeout is reached."""
+        out_queue = MessageQueue()
+        conn = Connection(0, 1, out_queue, timeout=1.0)
+        conn.send("Hello World", 0.0)
+        out_queue.get()
+
+        conn.wake_up(0.5)
+        self.assertTrue(out_queue.empty())
+        conn.wake_up(1.0)
+        self.assertEqual(
+            out_queue.get().get_content(), [0, 1, "content", 1, "Hello World"])
+        conn.wake_up(1.5)
+        self.assertTrue(out_queue.empty())
+
 
 class TestMessenger(ut.TestCase):
 
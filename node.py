@@ -1,5 +1,6 @@
 # coding=utf-8
 import random
+from collections import deque
 import messenger
 import logging
 from clock import clock_server
@@ -96,11 +97,11 @@ class Node:
         }
         self._event_id_generator = RandomGenerator()
         self._entry_id_generator = RandomGenerator()
-        self._event_queue = []
+        self._event_queue = deque()
         # either None or a list of the
         # [lamport_timestamp, event, recieved_replies]
         self._request_record = None
-        self._request_queue = []
+        self._request_queue = deque()
         self.r = r
 
     def get_logical_time(self):
@@ -117,8 +118,7 @@ class Node:
         return self.status["crashed"]
 
     def get_entries(self):
-        ordered_entries = self.board.get_ordered_entries()
-        return list(map(lambda entry: entry.to_dict(), ordered_entries))
+        return [entry.to_dict() for entry in self.board.iter_ordered_entries()]
 
     def create_entry(self, value):
         """
@@ -171,16 +171,8 @@ class Node:
 
     def _apply_event(self, event):
         try:
-            if event.action == "create":
-                try:
-                    self.board.add_entry(event.entry_id, event.value)
-                except KeyError:
-                    self.board.update_entry(event.entry_id, event.value)
-            elif event.action == "update":
-                try:
-                    self.board.update_entry(event.entry_id, event.value)
-                except KeyError:
-                    self.board.add_entry(event.entry_id, event.value)
+            if event.action in ("create", "update"):
+                self.board.update_or_create_entry(event.entry_id, event.value)
             elif event.action == "delete":
                 try:
                     self.board.delete_entry(event.entry_id)
@@ -295,7 +287,7 @@ class Node:
         self._request_record = None
         self._status = Node.IDLE_STATUS
         while len(self._request_queue) > 0:
-            self._handle_request_message(self._request_queue.pop(0))
+            self._handle_request_message(self._request_queue.popleft())
 
     def update(self):
         """
@@ -303,7 +295,7 @@ class Node:
         """
         if self._status == Node.IDLE_STATUS:
             if len(self._event_queue) > 0:
-                self._request_critical_section(self._event_queue.pop(0))
+                self._request_critical_section(self._event_queue.popleft())
         time = self._clock.get_time()
         msgs = self.messenger.receive(time)
         for msg in msgs:
@@ -40,8 +40,7 @@ class Node:
         return self._status["crashed"]
 
     def get_entries(self):
-        ordered_entries = self._board.get_ordered_entries()
-        return list(map(lambda entry: entry.to_dict(), ordered_entries))
+        return [entry.to_dict() for entry in self._board.iter_ordered_entries()]
 
     def create_entry(self, value: str) -> None:
         """
@@ -96,14 +95,15 @@ class Node:
             head_reference = BlockReference(
                 head_block.hashvalue,
                 head_block.origin)
-            new_block = Block.create_new(
+            new_block = Block.mine(
                 head_reference,
                 self._own_id,
                 head_block.index + 1,
-                self._randomizer.randint(0,1024*2**self._log_difficulty),
-                self._events
+                self._events,
+                self._log_difficulty,
+                [self._randomizer.randint(0,1024*2**self._log_difficulty)]
                 )
-            if int(new_block.hashvalue, 16) % (2**self._log_difficulty) == 0:
+            if new_block is not None:
                 logger.info(f"Node {self._own_id} created block")
                 self._blockchain.add_block(new_block)
                 self._send_to_all_others(new_block)
@@ -115,16 +115,8 @@ class Node:
 
     def _apply_event(self, board: Board, event: Event):
         try:
-            if event.action == "create":
-                try:
-                    board.add_entry(event.entry_id, event.value)
-                except KeyError:
-                    board.update_entry(event.entry_id, event.value)
-            elif event.action == "update":
-                try:
-                    board.update_entry(event.entry_id, event.value)
-                except KeyError:
-                    board.add_entry(event.entry_id, event.value)
+            if event.action in ("create", "update"):
+                board.update_or_create_entry(event.entry_id, event.value)
             elif event.action == "delete":
                 try:
                     board.delete_entry(event.entry_id)
@@ -5,7 +5,7 @@ import random
 from messenger import ReliableMessenger
 from transport import UnreliableTransport
 import logging
-from clock import clock_server, ExternalDeterminedClock
+from clock import clock_server
 from node_blockchain import Node
 
 logging.basicConfig(stream=sys.stdout, level=logging.ERROR, force=True)
@@ -13,7 +13,7 @@ logging.basicConfig(stream=sys.stdout, level=logging.ERROR, force=True)
 
 class TestBlockchainNode(ut.TestCase):
     def setUp(self):
-        clock_server.set_clock_factory(lambda n: ExternalDeterminedClock())
+        clock_server.set_clock_factory()
 
     def _make_transport(self, out_queue, in_queue, randomizer):
         return UnreliableTransport(out_queue, in_queue, randomizer)
@@ -54,8 +54,7 @@ class TestBlockchainNode(ut.TestCase):
         for i in range(200):
             time = i * timestep
             self._deliver_messages(transports, time)
-            for _, clock in clock_server.all_clocks():
-                clock.set_time(time)
+            clock_server.advance_time(time)
 
             for node in nodes:
                 if not node.is_crashed():
@@ -138,8 +138,7 @@ class Server(Bottle):
 
             # update all alive nodes, note that we lock!
             with self.lock:
-                for _, clock in clock_server.all_clocks():
-                    clock.set_time(t)
+                clock_server.advance_time(t)
                 for node in rand_nodes:
                     if not node.is_crashed():
                         try:
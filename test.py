@@ -14,7 +14,7 @@ import time
 import logging
 from transport import Transport, UnreliableTransport
 from messenger import ReliableMessenger
-from clock import clock_server, ExternalDeterminedClock
+from clock import clock_server
 from node import Node
 import node_blockchain as nb
 
@@ -70,8 +70,7 @@ def run_simulation(nodes, transports, actions=None, duration_seconds=5.0, time_s
         for transport in transports.values():
             transport.deliver(t)
 
-        for _, clock in clock_server.all_clocks():
-            clock.set_time(t)
+        clock_server.advance_time(t)
 
         for node in nodes:
             if not node.is_crashed():
@@ -130,7 +129,7 @@ def test_critical_section():
     print("TASK 2: Test Critical Section with Static Coordinator")
     print("=" * 60)
 
-    clock_server.set_clock_factory(lambda n: ExternalDeterminedClock())
+    clock_server.set_clock_factory()
 
     r = random.Random(100)
     nodes = [Node(ReliableMessenger(i, NUM_SERVERS, timeout=1.0), i, NUM_SERVERS, r) for i in range(NUM_SERVERS)]
@@ -159,7 +158,7 @@ def test_ricart_agravala():
     print("TASK 3: Test Ricart & Agravala Mutual Exclusion")
     print("=" * 60)
 
-    clock_server.set_clock_factory(lambda n: ExternalDeterminedClock())
+    clock_server.set_clock_factory()
 
     r = random.Random(100)
     rand = random.Random(77)
@@ -190,7 +189,7 @@ def test_critical_section_blockchain():
     print("TASK 4: Blockchain: Probabilistic Access ")
     print("=" * 60)
 
-    clock_server.set_clock_factory(lambda n: ExternalDeterminedClock())
+    clock_server.set_clock_factory()
 
     r = random.Random(100)
     log_difficulty = 4
@@ -229,7 +228,7 @@ def test_blockchain():
     print("TASK 4b: The blockchain")
     print("=" * 60)
 
-    clock_server.set_clock_factory(lambda n: ExternalDeterminedClock())
+    clock_server.set_clock_factory()
 
     log_difficulty = 10
     r = random.Random(100)
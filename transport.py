@@ -1,31 +1,95 @@
-import json
+import collections
+import heapq
+import itertools
 import queue
 import random
 import logging
+from typing import Iterator
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
 
+# like json, dicts with int keys are sent with str keys.
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
 class NetworkMessage:
+    __slots__ = ("content", "len")
+
     def __init__(self, content):
         try:
-            self.content = json.dumps(
-                content
-            )  # store as JSON string so it remains immutable!
+            self.content = orjson.dumps(
+                content, option=_ORJSON_OPTIONS
+            )  # store as JSON bytes so it remains immutable!
         except TypeError:
             print(content)
             raise
+        # size on the wire in bytes.
         self.len = len(self.content)
 
     def __str__(self):
-        return f"{self.content}"
+        return self.content.decode()
 
     def get_content(self):
-        return json.loads(self.content)
+        return orjson.loads(self.content)
 
 
-class MessageQueue(queue.SimpleQueue[NetworkMessage]):
-    pass
+class MessageQueue:
+    """
+    FIFO queue of NetworkMessages without the locking of queue.SimpleQueue.
+
+    deque.append and deque.popleft are atomic,
+     so one thread can still put while another one gets.
+    """
+
+    __slots__ = ("_messages",)
+
+    def __init__(self):
+        self._messages = collections.deque()
+
+    def put(self, message: NetworkMessage):
+        self._messages.append(message)
+
+    def get(self) -> NetworkMessage:
+        """
+        Remove and return the oldest message.
+
+        raises queue.Empty if there is none, it never blocks.
+        """
+        try:
+            return self._messages.popleft()
+        except IndexError:
+            raise queue.Empty()
+
+    get_nowait = get
+
+    def empty(self) -> bool:
+        return not self._messages
+
+    def qsize(self) -> int:
+        return len(self._messages)
+
+    def drain_all(self) -> list[NetworkMessage]:
+        """
+        Remove and return all messages currently in the queue as a list.
+
+        Messages put while draining are left for the next call.
+        """
+        popleft = self._messages.popleft
+        return [popleft() for _ in range(len(self._messages))]
+
+    def drain(self) -> Iterator[NetworkMessage]:
+        """
+        Remove and yield all messages, until the queue is empty.
+        """
+        popleft = self._messages.popleft
+        try:
+            while True:
+                yield popleft()
+        except IndexError:
+            return
 
 
 class Transport:
@@ -37,9 +101,8 @@ class Transport:
 
     def deliver(self, t: float):
         # use the time parameter to ensure replayability
-        while not self.in_queue.empty():
-            msg = self.in_queue.get()
-            logger.info("Delivering message at time {}: {}".format(t, msg))
+        for msg in self.in_queue.drain():
+            logger.info("Delivering message at time %s: %s", t, msg)
             self.out_queue.put(msg)
 
 
@@ -58,7 +121,10 @@ class UnreliableTransport(Transport):
         self.min_delay = 0.0
         self.max_delay = 0.0
         self.drop_rate = 0.0
-        self.buffered_messages = []  # List of (delivery_time, message) tuples
+        # heap of (delivery_time, sequence number, message) tuples,
+        #  the sequence number keeps messages with equal times in send order.
+        self.buffered_messages = []
+        self._sequence = itertools.count()
 
     def set_random_generator(self, r: random.Random):
         """Set the random number generator for reproducibility"""
@@ -81,15 +147,19 @@ class UnreliableTransport(Transport):
         1. Pull new messages from in_queue
         2. Decide whether to drop each message
         3. Add surviving messages to buffer with delivery time
-        4. Deliver buffered messages whose time has come
+        4. Deliver buffered messages whose time has come, earliest first
         """
-        # Process new incoming messages
-        while not self.in_queue.empty():
-            msg = self.in_queue.get()
+        # most transports are idle in a tick, leave them without any work.
+        if not self.buffered_messages and self.in_queue.empty():
+            return
 
+        # Process new incoming messages
+        random_ = self.r.random
+        drop_rate = self.drop_rate
+        for msg in self.in_queue.drain():
             # Decide whether to drop this message
-            if self.r.random() < self.drop_rate:
-                logger.info(f"Dropping message at time {t}: {msg}")
+            if random_() < drop_rate:
+                logger.info("Dropping message at time %s: %s", t, msg)
                 continue  # Message is lost
 
             # Calculate random delay for this message
@@ -97,19 +167,14 @@ class UnreliableTransport(Transport):
             delivery_time = t + delay
 
             # Add to buffer with delivery time
-            self.buffered_messages.append((delivery_time, msg))
+            heapq.heappush(
+                self.buffered_messages,
+                (delivery_time, next(self._sequence), msg))
 
         # Deliver messages whose time has come
-        # We need to check all buffered messages and deliver those ready
-        remaining_messages = []
-        for delivery_time, msg in self.buffered_messages:
-            if t >= delivery_time:
-                # Time to deliver this message
-                logger.info(f"Delivering message at time {t}: {msg}")
-                self.out_queue.put(msg)
-            else:
-                # Not ready yet, keep in buffer
-                remaining_messages.append((delivery_time, msg))
-
-        # Update buffer with only the messages that haven't been delivered yet
-        self.buffered_messages = remaining_messages
+        # The heap yields them by delivery time, so we stop at the first not ready.
+        buffered_messages = self.buffered_messages
+        while buffered_messages and buffered_messages[0][0] <= t:
+            _, _, msg = heapq.heappop(buffered_messages)
+            logger.info("Delivering message at time %s: %s", t, msg)
+            self.out_queue.put(msg)